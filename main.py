@@ -61,7 +61,7 @@ def main():
     camera.setup_window(WINDOW_NAME)
 
     # Carrega faces conhecidas
-    known_encodings, known_names = storage.load_known_faces()
+    gallery = storage.load_known_faces()
     
     active_trackers = [] # Lista de dicionários: {'tracker': obj, 'name': str}
     prev_frame_time = 0
@@ -108,13 +108,13 @@ def main():
             if current_mode == "vigilancia":
                 # Se houve cadastro recente, recarrega o banco
                 if app_state["reload_faces"] or settings.get("reload_faces", False):
-                    known_encodings, known_names = storage.load_known_faces()
+                    gallery = storage.load_known_faces()
                     app_state["reload_faces"] = False
                     settings["reload_faces"] = False
 
                 # 1. FASE DE DETECÇÃO (Tempo configurável pelo painel)
                 if curr_time - last_rec_time > settings["rec_interval"]:
-                    detections = recognizer.process_frame(frame, known_encodings, known_names, tolerance=settings["tolerance"])
+                    detections = recognizer.process_frame(frame, gallery, tolerance=settings["tolerance"])
                     
                     # Reinicia os rastreadores com as novas posições detectadas
                     active_trackers = []
@@ -1,5 +1,86 @@
 import json
 import os
+import queue
+import threading
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+PAGE_SIZE = 50      # Identidades por página na lista de rostos
+THUMB_SIZE = 150    # Lado máximo (px) das miniaturas em cache
+PLACEHOLDER = "…"   # Filho falso para permitir expandir sem carregar os arquivos
+
+
+class FaceIndex:
+    """Índice em memória de data/known, agrupado por identidade.
+
+    Lê apenas os nomes dos arquivos (sem decodificar imagens), então abrir o
+    painel continua rápido mesmo com dezenas de milhares de fotos.
+    """
+
+    def __init__(self, known_dir):
+        self.known_dir = known_dir
+        self.groups = {}  # nome -> lista ordenada de arquivos
+
+    @staticmethod
+    def identity_of(filename):
+        """Mesma convenção do StorageManager (ex: joao_123.jpg -> joao)."""
+        return filename.split('_')[0]
+
+    def scan(self):
+        """Reconstrói o índice a partir da pasta (usado apenas no 'Atualizar')."""
+        self.groups = {}
+        if os.path.exists(self.known_dir):
+            with os.scandir(self.known_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(IMAGE_EXTENSIONS):
+                        self.groups.setdefault(self.identity_of(entry.name), []).append(entry.name)
+        for files in self.groups.values():
+            files.sort()
+
+    def add(self, filename):
+        """Adiciona um arquivo. Retorna o nome da identidade ou None se ignorado."""
+        if not filename.endswith(IMAGE_EXTENSIONS):
+            return None
+        name = self.identity_of(filename)
+        files = self.groups.setdefault(name, [])
+        if filename in files:
+            return None
+        files.append(filename)
+        files.sort()
+        return name
+
+    def remove(self, filename):
+        """Remove um arquivo. Retorna o nome da identidade ou None se não existia."""
+        name = self.identity_of(filename)
+        files = self.groups.get(name)
+        if not files or filename not in files:
+            return None
+        files.remove(filename)
+        if not files:
+            del self.groups[name]
+        return name
+
+    def files(self, name):
+        return self.groups.get(name, [])
+
+    def contains(self, filename):
+        return filename in self.groups.get(self.identity_of(filename), [])
+
+    def search(self, query=""):
+        """Lista ordenada de identidades cujo nome contém 'query'."""
+        query = query.strip().lower()
+        return sorted(n for n in self.groups if query in n.lower())
+
+    def position(self, name, query=""):
+        """Posição de 'name' em search(query) e o total de resultados, sem ordenar tudo."""
+        query = query.strip().lower()
+        index = total = 0
+        for n in self.groups:
+            if query in n.lower():
+                total += 1
+                if n < name:
+                    index += 1
+        return index, total
+
 
 class ControlPanel:
     """Gerencia a janela de configurações usando GTK 3."""
@@ -8,6 +89,19 @@ class ControlPanel:
         self.settings = shared_settings
         self.load_config()
         self.known_dir = "data/known"
+        self.thumb_dir = "data/thumbs"
+        os.makedirs(self.thumb_dir, exist_ok=True)
+
+        self.face_index = FaceIndex(self.known_dir)
+        self.search_query = ""
+        self.page = 0
+        self.selected_file = None
+
+        # Fila de miniaturas: prioridade 0 = seleção do usuário, 1 = pré-geração
+        self.thumb_queue = queue.PriorityQueue()
+        self.thumb_seq = 0
+        self.thumb_pending = set()  # Arquivos já na fila (evita duplicatas ao paginar/buscar)
+        threading.Thread(target=self._thumb_worker, daemon=True).start()
         
         self.window = Gtk.Window(title=window_name)
         self.window.set_border_width(10)
@@ -84,14 +178,21 @@ class ControlPanel:
         vbox.pack_start(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL), False, False, 10)
         vbox.pack_start(Gtk.Label(label="Gerenciar Rostos Conhecidos"), False, False, 0)
 
-        # Lista de Arquivos (TreeView)
-        self.face_store = Gtk.ListStore(str)
-        self.populate_faces()
+        # Busca por nome
+        self.entry_search = Gtk.SearchEntry()
+        self.entry_search.set_placeholder_text("Buscar nome...")
+        self.entry_search.connect("search-changed", self.on_search_changed)
+        vbox.pack_start(self.entry_search, False, False, 0)
+
+        # Lista agrupada por identidade (TreeView): colunas = (rótulo, nome, arquivo)
+        self.face_store = Gtk.TreeStore(str, str, str)
 
         self.tree_faces = Gtk.TreeView(model=self.face_store)
         renderer = Gtk.CellRendererText()
-        column = Gtk.TreeViewColumn("Arquivo", renderer, text=0)
+        column = Gtk.TreeViewColumn("Rosto", renderer, text=0)
         self.tree_faces.append_column(column)
+        # Os arquivos de cada identidade só são carregados ao expandir
+        self.tree_faces.connect("test-expand-row", self.on_expand_identity)
 
         scroll = Gtk.ScrolledWindow()
         scroll.set_min_content_height(150)
@@ -102,6 +203,21 @@ class ControlPanel:
         selection = self.tree_faces.get_selection()
         selection.connect("changed", self.on_face_selected)
 
+        # Paginação
+        hbox_page = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+        vbox.pack_start(hbox_page, False, False, 0)
+
+        self.btn_prev = Gtk.Button(label="◀")
+        self.btn_prev.connect("clicked", self.on_prev_page)
+        hbox_page.pack_start(self.btn_prev, False, False, 0)
+
+        self.label_page = Gtk.Label()
+        hbox_page.pack_start(self.label_page, True, True, 0)
+
+        self.btn_next = Gtk.Button(label="▶")
+        self.btn_next.connect("clicked", self.on_next_page)
+        hbox_page.pack_start(self.btn_next, False, False, 0)
+
         hbox_data = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
         vbox.pack_start(hbox_data, False, False, 0)
 
@@ -118,6 +234,12 @@ class ControlPanel:
         self.image_preview = Gtk.Image()
         vbox.pack_start(self.image_preview, False, False, 0)
 
+        self.populate_faces()
+
+        # Adições/remoções em data/known chegam de forma incremental (sem reescanear)
+        self.known_monitor = Gio.File.new_for_path(self.known_dir).monitor_directory(Gio.FileMonitorFlags.NONE, None)
+        self.known_monitor.connect("changed", self.on_known_dir_changed)
+
         self.window.show_all()
 
     def on_mode_change(self, widget):
@@ -168,6 +290,7 @@ class ControlPanel:
             print(f"Erro ao salvar config: {e}")
 
     def on_close(self, widget):
+        self.thumb_queue.put((-1, 0, None))  # Encerra a thread de miniaturas
         self.save_config()
         Gtk.main_quit()
 
@@ -180,40 +303,240 @@ class ControlPanel:
         print("Configurações restauradas.")
 
     def populate_faces(self):
-        """Lê a pasta data/known e preenche a lista."""
+        """Lê a pasta data/known (apenas nomes) e mostra a página atual."""
+        self.face_index.scan()
+        self.prune_thumbnails()
+        self.show_page()
+
+    def prune_thumbnails(self):
+        """Apaga miniaturas cujo arquivo de origem não existe mais (ex: removido com o painel fechado)."""
+        with os.scandir(self.thumb_dir) as entries:
+            for entry in entries:
+                source = entry.name[:-len(".png")] if entry.name.endswith(".png") else None
+                if source is None or not self.face_index.contains(source):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+
+    def show_page(self):
+        """Preenche a lista com as identidades da página atual (sem tocar no disco)."""
+        names = self.face_index.search(self.search_query)
+        pages = max(1, (len(names) + PAGE_SIZE - 1) // PAGE_SIZE)
+        self.page = min(self.page, pages - 1)
+        page_names = names[self.page * PAGE_SIZE:(self.page + 1) * PAGE_SIZE]
+
         self.face_store.clear()
-        if os.path.exists(self.known_dir):
-            for f in os.listdir(self.known_dir):
-                if f.endswith(('.jpg', '.jpeg', '.png')):
-                    self.face_store.append([f])
+        for name in page_names:
+            self._append_identity(name)
+
+        self._update_page_label(len(names))
+
+        # Pré-gera em segundo plano as miniaturas da página visível
+        for name in page_names:
+            for filename in self.face_index.files(name):
+                self.request_thumbnail(filename, priority=1)
+
+    def _update_page_label(self, total):
+        pages = max(1, (total + PAGE_SIZE - 1) // PAGE_SIZE)
+        self.label_page.set_text(f"Página {self.page + 1}/{pages} ({total} nomes)")
+        self.btn_prev.set_sensitive(self.page > 0)
+        self.btn_next.set_sensitive(self.page < pages - 1)
+
+    def _identity_label(self, name):
+        return f"{name} ({len(self.face_index.files(name))})"
+
+    def _append_identity(self, name):
+        treeiter = self.face_store.append(None, [self._identity_label(name), name, ""])
+        self.face_store.append(treeiter, [PLACEHOLDER, name, ""])
+
+    def _find_identity_row(self, name):
+        """Procura a identidade entre as linhas da página atual (no máximo PAGE_SIZE)."""
+        treeiter = self.face_store.get_iter_first()
+        while treeiter:
+            if self.face_store[treeiter][1] == name:
+                return treeiter
+            treeiter = self.face_store.iter_next(treeiter)
+        return None
+
+    def _children_loaded(self, treeiter):
+        child = self.face_store.iter_children(treeiter)
+        return child is not None and self.face_store[child][2] != ""
+
+    def on_expand_identity(self, tree, treeiter, path):
+        """Substitui o filho falso pelos arquivos da identidade."""
+        if not self._children_loaded(treeiter):
+            name = self.face_store[treeiter][1]
+            child = self.face_store.iter_children(treeiter)
+            if child is not None:
+                self.face_store.remove(child)
+            for filename in self.face_index.files(name):
+                self.face_store.append(treeiter, [filename, name, filename])
+        return False  # Permite a expansão
+
+    def on_search_changed(self, widget):
+        self.search_query = widget.get_text()
+        self.page = 0
+        self.show_page()
+
+    def on_prev_page(self, widget):
+        self.page = max(0, self.page - 1)
+        self.show_page()
+
+    def on_next_page(self, widget):
+        self.page += 1
+        self.show_page()
 
     def on_refresh_list(self, widget):
         self.populate_faces()
 
+    def on_known_dir_changed(self, monitor, file, other_file, event_type):
+        filename = file.get_basename()
+        if event_type in (Gio.FileMonitorEvent.CREATED, Gio.FileMonitorEvent.MOVED_IN):
+            self.on_face_added(filename)
+        elif event_type in (Gio.FileMonitorEvent.DELETED, Gio.FileMonitorEvent.MOVED_OUT):
+            self.on_face_removed(filename)
+
+    def on_face_added(self, filename):
+        """Insere um único arquivo novo na lista."""
+        name = self.face_index.add(filename)
+        if name is None:
+            return
+        treeiter = self._find_identity_row(name)
+        if treeiter is None:
+            self._on_identity_changed(name)
+            return
+        self.face_store[treeiter][0] = self._identity_label(name)
+        if self._children_loaded(treeiter):
+            self.face_store.append(treeiter, [filename, name, filename])
+
+    def _on_identity_changed(self, name):
+        """Uma identidade entrou ou saiu do índice.
+
+        Se ela ordena antes do fim da página visível, as linhas da página se
+        deslocam e a página é refeita; se ordena depois, só o contador muda
+        (num cadastro em lote, isso evita refazer a página a cada arquivo).
+        """
+        if self.search_query.strip().lower() not in name.lower():
+            return
+        index, total = self.face_index.position(name, self.search_query)
+        if index < (self.page + 1) * PAGE_SIZE:
+            self.show_page()
+        else:
+            self._update_page_label(total)
+
+    def on_face_removed(self, filename):
+        """Remove um único arquivo da lista e sua miniatura."""
+        name = self.face_index.remove(filename)
+        if name is None:
+            return
+        try:
+            os.remove(self._thumb_path(filename))
+        except FileNotFoundError:
+            pass
+
+        if not self.face_index.files(name):
+            self._on_identity_changed(name)
+            return
+        treeiter = self._find_identity_row(name)
+        if treeiter is None:
+            return
+        self.face_store[treeiter][0] = self._identity_label(name)
+        child = self.face_store.iter_children(treeiter)
+        while child:
+            if self.face_store[child][2] == filename:
+                self.face_store.remove(child)
+                break
+            child = self.face_store.iter_next(child)
+
+    # --- Cache de miniaturas ---
+
+    def _thumb_path(self, filename):
+        return os.path.join(self.thumb_dir, filename + ".png")
+
+    def _thumb_is_fresh(self, filename):
+        thumb = self._thumb_path(filename)
+        try:
+            return os.path.getmtime(thumb) >= os.path.getmtime(os.path.join(self.known_dir, filename))
+        except OSError:
+            return False
+
+    def request_thumbnail(self, filename, priority=1):
+        """Agenda a geração da miniatura na thread de fundo."""
+        # A seleção do usuário sempre entra na frente; pré-geração não se repete
+        if priority > 0 and filename in self.thumb_pending:
+            return
+        self.thumb_pending.add(filename)
+        self.thumb_seq += 1
+        self.thumb_queue.put((priority, self.thumb_seq, filename))
+
+    def _thumb_worker(self):
+        """Gera miniaturas persistentes em data/thumbs sem travar a interface."""
+        while True:
+            _, _, filename = self.thumb_queue.get()
+            if filename is None:
+                break
+            self.thumb_pending.discard(filename)
+            if not self._thumb_is_fresh(filename):
+                try:
+                    # Decodifica a imagem grande uma única vez; as próximas leituras usam o cache
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                        os.path.join(self.known_dir, filename), THUMB_SIZE, THUMB_SIZE, True)
+                    tmp_path = self._thumb_path(filename) + ".tmp"
+                    pixbuf.savev(tmp_path, "png", [], [])
+                    os.replace(tmp_path, self._thumb_path(filename))
+                except Exception as e:
+                    print(f"Erro ao gerar miniatura de {filename}: {e}")
+                    continue
+            if filename == self.selected_file:
+                GLib.idle_add(self.show_thumbnail, filename)
+
+    def show_thumbnail(self, filename):
+        """Mostra a miniatura em cache (chamado na thread do GTK)."""
+        if filename != self.selected_file:
+            return False
+        try:
+            self.image_preview.set_from_file(self._thumb_path(filename))
+        except Exception as e:
+            print(f"Erro ao carregar preview: {e}")
+            self.image_preview.clear()
+        return False
+
     def on_face_selected(self, selection):
-        """Carrega a miniatura da imagem selecionada."""
+        """Mostra a miniatura do arquivo selecionado (ou da primeira foto da identidade)."""
         model, treeiter = selection.get_selected()
-        if treeiter:
-            filename = model[treeiter][0]
-            filepath = os.path.join(self.known_dir, filename)
-            try:
-                # Carrega a imagem redimensionada para 150px de largura (preservando proporção)
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(filepath, 150, 150, True)
-                self.image_preview.set_from_pixbuf(pixbuf)
-            except Exception as e:
-                print(f"Erro ao carregar preview: {e}")
-                self.image_preview.clear()
+        if not treeiter:
+            return
+        name, filename = model[treeiter][1], model[treeiter][2]
+        if not filename:
+            if model.iter_parent(treeiter) is not None:
+                return  # Filho falso
+            files = self.face_index.files(name)
+            if not files:
+                return
+            filename = files[0]
+
+        self.selected_file = filename
+        if self._thumb_is_fresh(filename):
+            self.show_thumbnail(filename)
+        else:
+            self.image_preview.clear()
+            self.request_thumbnail(filename, priority=0)
 
     def on_delete_face(self, widget):
         selection = self.tree_faces.get_selection()
         model, treeiter = selection.get_selected()
         if treeiter:
-            filename = model[treeiter][0]
+            filename = model[treeiter][2]
+            if not filename:
+                print("Selecione um arquivo (expanda o nome) para excluir.")
+                return
             filepath = os.path.join(self.known_dir, filename)
             try:
                 os.remove(filepath)
-                model.remove(treeiter)
+                self.on_face_removed(filename)
                 self.image_preview.clear() # Limpa o preview
+                self.selected_file = None
                 print(f"Arquivo removido: {filepath}")
                 self.settings["reload_faces"] = True # Avisa o main.py para recarregar
             except Exception as e:
@@ -227,10 +550,10 @@ class ControlPanel:
 def launch_panel(shared_settings):
     """Função auxiliar para iniciar o processo."""
     # Importação movida para cá para evitar conflito (SegFault) com OpenCV no processo pai
-    global Gtk, GdkPixbuf
+    global Gtk, GdkPixbuf, Gio, GLib
     import gi
     gi.require_version('Gtk', '3.0')
-    from gi.repository import Gtk, GdkPixbuf
+    from gi.repository import Gtk, GdkPixbuf, Gio, GLib
 
     app = ControlPanel(shared_settings)
     app.run()
\ No newline at end of file
@@ -0,0 +1,176 @@
+import os
+import time
+import argparse
+from multiprocessing import Pool, cpu_count
+import cv2
+import numpy as np
+import face_recognition
+
+from src.gallery import dequantize
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+DETECT_MAX_SIDE = 1024  # Imagens maiores são reduzidas só para a detecção
+CROP_MARGIN = 0.5       # Margem em volta do rosto (permite reencodar o recorte depois)
+
+
+def find_sources(root):
+    """Lista (nome, caminho) de uma árvore pasta/nome/*.jpg|*.mp4."""
+    sources = []
+    for person in sorted(os.listdir(root)):
+        person_dir = os.path.join(root, person)
+        if not os.path.isdir(person_dir):
+            continue
+        # O nome é tudo antes do primeiro '_' no arquivo salvo (ver StorageManager)
+        name = person.strip().replace("_", "-")
+        for filename in sorted(os.listdir(person_dir)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS):
+                sources.append((name, os.path.join(person_dir, filename)))
+    return sources
+
+
+def _encode_rgb(rgb):
+    """Detecta e encoda o rosto de uma imagem RGB.
+
+    Retorna (status, encoding, jpeg_do_recorte). Rejeita imagens com zero ou
+    vários rostos.
+    """
+    h, w = rgb.shape[:2]
+    scale = min(1.0, DETECT_MAX_SIDE / max(h, w))
+    small = cv2.resize(rgb, (0, 0), fx=scale, fy=scale) if scale < 1.0 else rgb
+
+    locations = face_recognition.face_locations(small)
+    if len(locations) == 0:
+        return "sem_rosto", None, None
+    if len(locations) > 1:
+        return "varios_rostos", None, None
+
+    top, right, bottom, left = (int(v / scale) for v in locations[0])
+    encoding = face_recognition.face_encodings(rgb, [(top, right, bottom, left)])[0]
+
+    mh, mw = int((bottom - top) * CROP_MARGIN), int((right - left) * CROP_MARGIN)
+    crop = rgb[max(0, top - mh):min(h, bottom + mh), max(0, left - mw):min(w, right + mw)]
+    ok, jpeg = cv2.imencode(".jpg", cv2.cvtColor(crop, cv2.COLOR_RGB2BGR))
+    if not ok:
+        return "erro", None, None
+    return "ok", encoding, jpeg.tobytes()
+
+
+def _encode_source(task):
+    """Worker do pool: processa uma imagem ou os quadros amostrados de um vídeo."""
+    name, path, frame_interval, max_frames = task
+    try:
+        if path.lower().endswith(IMAGE_EXTENSIONS):
+            rgb = face_recognition.load_image_file(path)
+            return [(name, path) + _encode_rgb(rgb)]
+
+        results = []
+        cap = cv2.VideoCapture(path)
+        try:
+            if not cap.isOpened():
+                print(f"Erro ao abrir vídeo {path}")
+                return [(name, path, "erro", None, None)]
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            step = max(1, int(round(fps * frame_interval)))
+            index = 0
+            while len(results) < max_frames and cap.grab():
+                # Só decodifica os quadros amostrados
+                if index % step == 0:
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        break
+                    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    results.append((name, f"{path}#{index}") + _encode_rgb(rgb))
+                index += 1
+        finally:
+            cap.release()
+
+        if not results:
+            # Nenhum quadro decodificado: conta como erro em vez de sumir do relatório
+            print(f"Erro ao ler quadros do vídeo {path}")
+            return [(name, path, "erro", None, None)]
+        return results
+    except Exception as e:
+        print(f"Erro ao processar {path}: {e}")
+        return [(name, path, "erro", None, None)]
+
+
+def bulk_enroll(storage, root, workers=None, dup_distance=0.1, frame_interval=0.5, max_frames=30,
+                batch_size=200):
+    """Importa em lote uma árvore de fotos/vídeos por pessoa para a galeria.
+
+    Os rostos são encodados em paralelo; recortes quase idênticos a outro já
+    aceito da mesma pessoa (distância < dup_distance) são descartados. Os
+    aceitos são gravados a cada 'batch_size' rostos, então uma interrupção
+    só perde o lote em andamento.
+    Retorna um dicionário com as contagens por status (None se 'root' não existir).
+    """
+    if not os.path.isdir(root):
+        print(f"Erro: pasta '{root}' não encontrada.")
+        return None
+
+    sources = find_sources(root)
+    workers = workers or cpu_count()
+    tasks = [(name, path, frame_interval, max_frames) for name, path in sources]
+    print(f"Importando {len(tasks)} arquivos de '{root}' com {workers} processos...")
+
+    # Encodings já cadastrados por pessoa, para detectar duplicatas
+    gallery = storage.load_known_faces()
+    accepted = {}
+    if len(gallery):
+        existing = dequantize(np.asarray(gallery.codes), np.asarray(gallery.scales))
+        for row, name in enumerate(gallery.row_names()):
+            accepted.setdefault(name, []).append(existing[row])
+
+    counts = {"ok": 0, "duplicado": 0, "sem_rosto": 0, "varios_rostos": 0, "erro": 0}
+    faces = []
+    frames = 0
+    next_report = 100
+    start = time.perf_counter()
+
+    try:
+        with Pool(workers) as pool:
+            for results in pool.imap_unordered(_encode_source, tasks, chunksize=4):
+                for name, source, status, encoding, jpeg in results:
+                    frames += 1
+                    if status == "ok":
+                        previous = accepted.get(name)
+                        if previous and face_recognition.face_distance(previous, encoding).min() < dup_distance:
+                            status = "duplicado"
+                        else:
+                            accepted.setdefault(name, []).append(encoding)
+                            faces.append((name, jpeg, encoding))
+                    counts[status] += 1
+                if len(faces) >= batch_size:
+                    storage.add_known_faces(faces)
+                    faces = []
+                if frames >= next_report:
+                    print(f"  {frames} imagens/quadros processados...")
+                    next_report += 100
+    finally:
+        # Grava o último lote mesmo em caso de erro ou Ctrl-C
+        storage.add_known_faces(faces)
+
+    elapsed = time.perf_counter() - start
+
+    print(f"Concluído em {elapsed:.1f}s: {frames} imagens/quadros "
+          f"({frames / max(elapsed, 1e-9):.1f}/s, {len(tasks) / max(elapsed, 1e-9):.1f} arquivos/s)")
+    print(f"Aceitos: {counts['ok']} | Duplicados: {counts['duplicado']} | Sem rosto: {counts['sem_rosto']} "
+          f"| Vários rostos: {counts['varios_rostos']} | Erros: {counts['erro']}")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cadastro em lote a partir de pastas (nome/*.jpg) ou vídeos (nome/*.mp4).")
+    parser.add_argument("source", help="Pasta com uma subpasta por pessoa")
+    parser.add_argument("--data", default="data", help="Pasta base de dados (padrão: data)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    parser.add_argument("--dup", type=float, default=0.1, help="Distância abaixo da qual um rosto é duplicado")
+    parser.add_argument("--interval", type=float, default=0.5, help="Segundos entre quadros amostrados dos vídeos")
+    parser.add_argument("--max-frames", type=int, default=30, help="Máximo de quadros por vídeo")
+    parser.add_argument("--batch", type=int, default=200, help="Rostos aceitos por gravação na galeria")
+    args = parser.parse_args()
+
+    from src.storage import StorageManager
+    bulk_enroll(StorageManager(args.data), args.source, workers=args.workers, dup_distance=args.dup,
+                frame_interval=args.interval, max_frames=args.max_frames, batch_size=args.batch)
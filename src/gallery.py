@@ -0,0 +1,306 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from contextlib import contextmanager
+import numpy as np
+import face_recognition
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, a galeria fica sem trava entre processos
+    fcntl = None
+
+ENCODING_DIM = 128
+CHUNK_ROWS = 65536  # Linhas convertidas por vez no cálculo de distância (limita memória temporária)
+
+
+def quantize(encodings):
+    """Quantiza encodings float (N x 128) para int8 com uma escala por linha."""
+    encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_DIM)
+    scales = np.abs(encodings).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(encodings / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize(codes, scales):
+    """Reconstrói os encodings aproximados em float32."""
+    return codes.astype(np.float32) * scales[:, None]
+
+
+@contextmanager
+def gallery_lock(gallery_dir, exclusive=True):
+    """Trava (flock) em gallery_dir/lock: exclusiva para escrever, compartilhada para ler.
+
+    Quem escreve deve segurar a trava exclusiva durante toda a leitura,
+    modificação e gravação, para que dois processos não se sobreponham.
+    """
+    os.makedirs(gallery_dir, exist_ok=True)
+    with open(os.path.join(gallery_dir, "lock"), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class FaceGallery:
+    """Galeria compacta de faces conhecidas.
+
+    Os encodings ficam numa matriz int8 contígua (N x 128) com uma escala por
+    linha; cada linha aponta para um id inteiro na tabela de nomes. Ao carregar
+    do disco os arrays são mapeados em memória (mmap), então vários processos
+    compartilham a mesma cópia via cache de páginas do sistema.
+    """
+
+    def __init__(self, codes, scales, norms, ids, names, files, rejected=None):
+        self.codes = codes    # int8 (N, 128)
+        self.scales = scales  # float32 (N,)
+        self.norms = norms    # float32 (N,) - norma² de cada linha reconstruída
+        self.ids = ids        # int32 (N,) - índice em self.names
+        self.names = names    # tabela de nomes (id -> nome)
+        self.files = files    # arquivo de origem de cada linha (para sincronizar com data/known)
+        self.rejected = rejected or {}  # arquivo -> mtime das fotos sem rosto (não reencodar)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, ENCODING_DIM), np.int8), np.zeros(0, np.float32),
+                   np.zeros(0, np.float32), np.zeros(0, np.int32), [], [])
+
+    @classmethod
+    def from_encodings(cls, encodings, names, files):
+        """Cria a galeria a partir de encodings float64 do face_recognition."""
+        if len(encodings) == 0:
+            return cls.empty()
+        codes, scales = quantize(encodings)
+        table = sorted(set(names))
+        name_to_id = {n: i for i, n in enumerate(table)}
+        ids = np.array([name_to_id[n] for n in names], dtype=np.int32)
+        norms = (dequantize(codes, scales) ** 2).sum(axis=1).astype(np.float32)
+        return cls(codes, scales, norms, ids, table, list(files))
+
+    def __len__(self):
+        return len(self.files)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes + self.norms.nbytes + self.ids.nbytes
+
+    def row_names(self):
+        """Nome de cada linha (na ordem da matriz)."""
+        return [self.names[i] for i in self.ids]
+
+    def extend(self, encodings, names, files):
+        """Retorna uma nova galeria com as linhas adicionadas."""
+        if len(encodings) == 0:
+            return self
+        all_names = self.row_names() + list(names)
+        table = sorted(set(all_names))
+        name_to_id = {n: i for i, n in enumerate(table)}
+        codes, scales = quantize(encodings)
+        norms = (dequantize(codes, scales) ** 2).sum(axis=1).astype(np.float32)
+        return FaceGallery(
+            np.concatenate([self.codes, codes]),
+            np.concatenate([self.scales, scales]),
+            np.concatenate([self.norms, norms]),
+            np.array([name_to_id[n] for n in all_names], dtype=np.int32),
+            table,
+            self.files + list(files),
+            self.rejected,
+        )
+
+    def without_files(self, files):
+        """Retorna uma nova galeria sem as linhas vindas de 'files'."""
+        files = set(files)
+        keep = np.array([f not in files for f in self.files], dtype=bool)
+        if keep.all():
+            return self
+        row_names = [n for n, k in zip(self.row_names(), keep) if k]
+        table = sorted(set(row_names))
+        name_to_id = {n: i for i, n in enumerate(table)}
+        return FaceGallery(
+            np.ascontiguousarray(self.codes[keep]),
+            self.scales[keep],
+            self.norms[keep],
+            np.array([name_to_id[n] for n in row_names], dtype=np.int32),
+            table,
+            [f for f, k in zip(self.files, keep) if k],
+            self.rejected,
+        )
+
+    def distances(self, encoding):
+        """Distância euclidiana de 'encoding' para cada linha (equivale a face_distance)."""
+        encoding = np.asarray(encoding, dtype=np.float32)
+        query_norm = float(encoding @ encoding)
+        result = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), CHUNK_ROWS):
+            end = start + CHUNK_ROWS
+            dots = self.codes[start:end].astype(np.float32) @ encoding
+            sq = self.norms[start:end] + query_norm - 2.0 * self.scales[start:end] * dots
+            result[start:end] = np.sqrt(np.maximum(sq, 0.0))
+        return result
+
+    def match(self, encoding, tolerance=0.6):
+        """Retorna o nome mais próximo dentro da tolerância, ou 'Desconhecido'."""
+        if len(self) == 0:
+            return "Desconhecido"
+        face_distances = self.distances(encoding)
+        best = int(np.argmin(face_distances))
+        if face_distances[best] <= tolerance:
+            return self.names[self.ids[best]]
+        return "Desconhecido"
+
+    @classmethod
+    def load(cls, gallery_dir, lock=True):
+        """Carrega a galeria do disco com mmap (galeria vazia se não existir).
+
+        Use lock=False quando o chamador já segura gallery_lock (flock não é
+        reentrante entre descritores do mesmo processo).
+        """
+        if lock:
+            with gallery_lock(gallery_dir, exclusive=False):
+                return cls.load(gallery_dir, lock=False)
+
+        meta_path = os.path.join(gallery_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return cls.empty()
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        rejected = meta.get("rejected", {})
+        if meta["count"] == 0:
+            gallery = cls.empty()
+            gallery.rejected = rejected
+            return gallery
+        v = meta["version"]
+        arrays = [np.load(os.path.join(gallery_dir, f"{key}_{v}.npy"), mmap_mode="r")
+                  for key in ("codes", "scales", "norms", "ids")]
+        return cls(*arrays, meta["names"], meta["files"], rejected)
+
+    def save(self, gallery_dir):
+        """Grava uma nova versão e troca o meta.json atomicamente.
+
+        Deve ser chamado segurando gallery_lock (exclusiva). A versão anterior
+        é mantida no disco; só as mais antigas que ela são apagadas.
+        """
+        os.makedirs(gallery_dir, exist_ok=True)
+        meta_path = os.path.join(gallery_dir, "meta.json")
+        previous = None
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                previous = json.load(f).get("version")
+
+        version = time.strftime("%Y%m%d%H%M%S") + f"{time.time_ns() % 1000000:06d}"
+        arrays = {"codes": self.codes, "scales": self.scales, "norms": self.norms, "ids": self.ids}
+        for key, array in arrays.items():
+            np.save(os.path.join(gallery_dir, f"{key}_{version}.npy"), np.ascontiguousarray(array))
+
+        meta = {"version": version, "previous": previous, "dim": ENCODING_DIM, "count": len(self),
+                "names": self.names, "files": self.files, "rejected": self.rejected}
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+        # Remove versões mais antigas que a anterior
+        # (no Windows, arquivos ainda mapeados ficam para a próxima vez)
+        keep = {version, previous}
+        for filename in os.listdir(gallery_dir):
+            if filename.endswith(".npy") and filename[:-4].rsplit("_", 1)[-1] not in keep:
+                try:
+                    os.remove(os.path.join(gallery_dir, filename))
+                except OSError:
+                    pass
+
+
+def accuracy_report(known_dir, gallery, sample=200, tolerance=0.6):
+    """Compara a galeria quantizada com float64 e mede memória e latência.
+
+    Reencoda uma amostra de 'known_dir' em float64 (o formato antigo) para
+    medir o erro de distância e a concordância das decisões de match.
+    """
+    files = [f for f in os.listdir(known_dir) if f.endswith((".jpg", ".png", ".jpeg"))]
+    random.shuffle(files)
+
+    encodings, names = [], []
+    for filename in files:
+        if len(encodings) >= sample:
+            break
+        image = face_recognition.load_image_file(os.path.join(known_dir, filename))
+        found = face_recognition.face_encodings(image)
+        if found:
+            encodings.append(found[0])
+            names.append(filename.split('_')[0])
+    if len(encodings) < 2:
+        print("Amostra insuficiente para o relatório (mínimo 2 rostos).")
+        return
+
+    # --- Precisão (amostra contra ela mesma, excluindo a própria linha) ---
+    reference = np.array(encodings)
+    quantized = FaceGallery.from_encodings(encodings, names, range(len(encodings)))
+    errors, same_nn, same_decision = [], 0, 0
+    for i, encoding in enumerate(encodings):
+        d64 = face_recognition.face_distance(reference, encoding)
+        dq = quantized.distances(encoding).astype(np.float64)
+        d64[i] = dq[i] = np.inf
+        errors.append(np.abs(d64[np.isfinite(d64)] - dq[np.isfinite(dq)]))
+        same_nn += np.argmin(d64) == np.argmin(dq)
+        same_decision += (d64.min() <= tolerance) == (dq.min() <= tolerance)
+    errors = np.concatenate(errors)
+    n = len(encodings)
+
+    print(f"Amostra: {n} rostos (galeria completa: {len(gallery)} linhas)")
+    print(f"Erro de distância int8 vs float64: médio {errors.mean():.5f}, máximo {errors.max():.5f}")
+    print(f"Mesmo vizinho mais próximo: {100.0 * same_nn / n:.1f}%")
+    print(f"Mesma decisão (tolerância {tolerance}): {100.0 * same_decision / n:.1f}%")
+
+    rows = len(gallery)
+    if rows == 0:
+        return
+
+    # --- Memória: o formato antigo (um ndarray float64 por rosto + um nome por rosto) é
+    # reconstruído de verdade e medido com sys.getsizeof, como o formato compacto ---
+    legacy = [row.astype(np.float64) for row in dequantize(np.asarray(gallery.codes), np.asarray(gallery.scales))]
+    legacy_names = gallery.row_names()
+    legacy_bytes = (sys.getsizeof(legacy) + sum(sys.getsizeof(a) for a in legacy)
+                    + sys.getsizeof(legacy_names) + sum(sys.getsizeof(n) for n in legacy_names))
+    table_bytes = sys.getsizeof(gallery.names) + sum(sys.getsizeof(n) for n in gallery.names)
+    files_bytes = sys.getsizeof(gallery.files) + sum(sys.getsizeof(f) for f in gallery.files)
+    compact_bytes = gallery.nbytes + table_bytes
+    print(f"Memória float64 (listas Python): {legacy_bytes / 1e6:.2f} MB")
+    print(f"Memória compacta (int8 + escalas + tabela de nomes): {compact_bytes / 1e6:.2f} MB "
+          f"({legacy_bytes / max(compact_bytes, 1):.1f}x menor, compartilhada via mmap)")
+    print(f"  + lista de arquivos de origem (sincronização): {files_bytes / 1e6:.2f} MB")
+
+    # --- Latência de uma consulta contra a galeria inteira ---
+    query = encodings[0]
+    repeats = 20
+    start = time.perf_counter()
+    for _ in range(repeats):
+        face_recognition.face_distance(legacy, query)
+    legacy_ms = (time.perf_counter() - start) * 1000 / repeats
+    start = time.perf_counter()
+    for _ in range(repeats):
+        gallery.distances(query)
+    compact_ms = (time.perf_counter() - start) * 1000 / repeats
+    print(f"Latência por consulta: float64 {legacy_ms:.2f} ms, compacta {compact_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Galeria compacta de faces conhecidas.")
+    parser.add_argument("command", choices=["build", "report"],
+                        help="build: sincroniza data/known -> data/gallery | report: precisão/memória/latência")
+    parser.add_argument("--data", default="data", help="Pasta base de dados (padrão: data)")
+    parser.add_argument("--sample", type=int, default=200, help="Tamanho da amostra do relatório")
+    args = parser.parse_args()
+
+    from src.storage import StorageManager
+    storage = StorageManager(args.data)
+    gallery = storage.load_known_faces()
+    print(f"Galeria: {len(gallery)} encodings, {len(gallery.names)} nomes, {gallery.nbytes / 1e6:.2f} MB")
+    if args.command == "report":
+        accuracy_report(storage.known_dir, gallery, sample=args.sample)
@@ -1,6 +1,5 @@
 import face_recognition
 import cv2
-import numpy as np
 
 class FaceRecognizer:
     """Responsável pela lógica de detecção e comparação de faces."""
@@ -8,7 +7,7 @@ class FaceRecognizer:
     def __init__(self):
         pass
 
-    def process_frame(self, frame, known_encodings, known_names, tolerance=0.6):
+    def process_frame(self, frame, gallery, tolerance=0.6):
         """
         Processa o frame para encontrar faces e identificar nomes.
         Retorna uma lista de tuplas (top, right, bottom, left, name).
@@ -22,14 +21,8 @@ class FaceRecognizer:
 
         results = []
         for face_encoding, location in zip(face_encodings, face_locations):
-            matches = face_recognition.compare_faces(known_encodings, face_encoding, tolerance=tolerance)
-            name = "Desconhecido"
-
-            face_distances = face_recognition.face_distance(known_encodings, face_encoding)
-            if len(face_distances) > 0:
-                best_match_index = np.argmin(face_distances)
-                if matches[best_match_index]:
-                    name = known_names[best_match_index]
+            # Galeria compacta (int8): distância à face mais próxima dentro da tolerância
+            name = gallery.match(face_encoding, tolerance=tolerance)
             
             # Escala as coordenadas de volta para o tamanho original (x4)
             top, right, bottom, left = location
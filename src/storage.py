@@ -3,6 +3,7 @@ import time
 import cv2
 import face_recognition
 from datetime import datetime
+from src.gallery import FaceGallery, gallery_lock
 
 class StorageManager:
     """Responsável pela persistência de dados (salvar/carregar imagens)."""
@@ -11,6 +12,7 @@ class StorageManager:
         self.base_dir = base_dir
         self.known_dir = os.path.join(base_dir, "known")
         self.unknown_dir = os.path.join(base_dir, "unknown")
+        self.gallery_dir = os.path.join(base_dir, "gallery")
         self.log_file = os.path.join(base_dir, "log.csv")
         
         os.makedirs(self.known_dir, exist_ok=True)
@@ -27,6 +29,34 @@ class StorageManager:
         cv2.imwrite(path, frame)
         print(f"Dados de '{name}' salvos em {path}")
 
+    def add_known_faces(self, faces):
+        """Salva recortes já encodados direto na galeria, sem reencodar.
+
+        'faces' é uma lista de (nome, jpeg_do_recorte, encoding). Os JPEGs são
+        gravados com nome temporário e só renomeados depois que a galeria é
+        salva, tudo sob a trava da galeria, para que nenhuma sincronização os
+        trate como fotos novas.
+        """
+        if not faces:
+            return
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        with gallery_lock(self.gallery_dir):
+            gallery = FaceGallery.load(self.gallery_dir, lock=False)
+            encodings, names, files = [], [], []
+            for i, (name, jpeg, encoding) in enumerate(faces):
+                filename = f"{name}_{stamp}_{i:05d}.jpg"
+                with open(os.path.join(self.known_dir, filename + ".tmp"), "wb") as f:
+                    f.write(jpeg)
+                encodings.append(encoding)
+                names.append(name)
+                files.append(filename)
+
+            gallery.extend(encodings, names, files).save(self.gallery_dir)
+            for filename in files:
+                path = os.path.join(self.known_dir, filename)
+                os.replace(path + ".tmp", path)
+        print(f"{len(files)} rostos adicionados à galeria.")
+
     def save_unknown_event(self, frame):
         """Salva a foto de um desconhecido (vigilância)."""
         filename = f"INTRUSO_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
@@ -35,24 +65,49 @@ class StorageManager:
         return path
 
     def load_known_faces(self):
-        """Carrega todas as faces conhecidas da pasta data/known."""
-        known_encodings = []
-        known_names = []
+        """Sincroniza data/known com a galeria compacta e a carrega (mmap).
 
+        Apenas fotos novas são encodadas; linhas de fotos removidas são descartadas.
+        Fotos sem rosto ficam registradas (nome + mtime) para não serem reprocessadas.
+        """
         print("Carregando banco de dados de faces...")
-        for filename in os.listdir(self.known_dir):
-            if filename.endswith((".jpg", ".png", ".jpeg")):
+        with gallery_lock(self.gallery_dir):
+            gallery = FaceGallery.load(self.gallery_dir, lock=False)
+
+            on_disk = {f for f in os.listdir(self.known_dir) if f.endswith((".jpg", ".png", ".jpeg"))}
+            indexed = set(gallery.files)
+            removed = indexed - on_disk
+
+            # Rejeitadas continuam ignoradas enquanto o arquivo não mudar
+            rejected = {}
+            for filename, mtime in gallery.rejected.items():
+                if filename in on_disk and os.path.getmtime(os.path.join(self.known_dir, filename)) == mtime:
+                    rejected[filename] = mtime
+            added = sorted(on_disk - indexed - set(rejected))
+
+            if not removed and not added and rejected == gallery.rejected:
+                return gallery
+
+            encodings, names, files = [], [], []
+            for filename in added:
                 filepath = os.path.join(self.known_dir, filename)
                 image = face_recognition.load_image_file(filepath)
-                encodings = face_recognition.face_encodings(image)
-                
-                if encodings:
-                    known_encodings.append(encodings[0])
+                found = face_recognition.face_encodings(image)
+
+                if found:
+                    encodings.append(found[0])
                     # Assume que o nome do arquivo é o nome da pessoa (ex: joao_123.jpg -> joao)
-                    name = filename.split('_')[0]
-                    known_names.append(name)
-        
-        return known_encodings, known_names
+                    names.append(filename.split('_')[0])
+                    files.append(filename)
+                else:
+                    rejected[filename] = os.path.getmtime(filepath)
+
+            gallery = gallery.without_files(removed).extend(encodings, names, files)
+            gallery.rejected = rejected
+            gallery.save(self.gallery_dir)
+            print(f"Galeria atualizada: +{len(files)} / -{len(removed)} ({len(gallery)} encodings, "
+                  f"{len(rejected)} fotos sem rosto ignoradas)")
+            return FaceGallery.load(self.gallery_dir, lock=False)
 
     def log_access(self, name):
         """Registra o acesso em um arquivo CSV."""